@@ -7,6 +7,19 @@ import numpy as np
 from datetime import datetime, timedelta
 import time
 
+from arrow_source import ArrowCandleSource
+from rollups import EPOCH, RollupAggregator
+from timestream import WrittenKeyFilter, write_record_batches
+
+# Closed candles never change, so every (re-)send of a candle carries the same version and
+# Timestream treats duplicates as already written instead of overwriting them
+CANDLE_RECORD_VERSION = 1
+
+# Higher timeframes maintained incrementally from the strategy candles, and the indicator
+# columns whose last/mean values are kept per rolled-up bucket
+ROLLUP_TIMEFRAMES = ["1h", "4h", "1d"]
+ROLLUP_INDICATORS = ["rsi", "adx", "tema", "bb_middleband"]
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
@@ -29,18 +42,47 @@ def main():
     # initialize freqtrade stuff
     freqtrade_client = FtRestClient("http://127.0.0.1:8080", "freqtrader", "1234")
     strategy = "SampleStrategy"
-    strategy_timeframe = freqtrade_client.strategy(strategy)["timeframe"]
-    pair = "BTC/USDT"
+    pairs = ["BTC/USDT"]
     exchange = "Binance"
+    # Read the analyzed candles from the strategy's Arrow export (ArrowExportMixin) instead of the
+    # REST API. Requires freqtrade's user_data volume to be mounted into this container.
+    arrow_export_dir = None  # e.g. "/freqtrade/user_data/arrow_export"
 
-    # Get the status of the bot (should log "pong" if ok)
-    logging.info(freqtrade_client.ping())
+    candle_source = None
+    if arrow_export_dir:
+        candle_source = ArrowCandleSource(arrow_export_dir, fallback=RestCandleSource(freqtrade_client))
 
-    while True:
-        logging.info("Starting loop")
+    run_updater(
+        freqtrade_client, timestream_write_client, timestream_query_client, database_name, table_name,
+        strategy, pairs, exchange, candle_source=candle_source
+    )
+
+
+class SystemClock:
+    """
+    Wall clock used by the updater. The replay harness swaps in a virtual clock.
+    """
+
+    def now(self):
+        return datetime.now().astimezone()
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
 
-        # get data from freqtrade
-        candles = freqtrade_client.pair_candles(pair, strategy_timeframe, 10)
+
+class RestCandleSource:
+    """
+    Fetches the analyzed candles of a pair from the freqtrade REST API.
+    """
+
+    def __init__(self, freqtrade_client):
+        self.freqtrade_client = freqtrade_client
+
+    def candles(self, pair, timeframe, limit=None):
+        """
+        Return the newest candles (at most limit) as a DataFrame indexed by date.
+        """
+        candles = self.freqtrade_client.pair_candles(pair, timeframe, limit)
 
         # Convert the response to a DataFrame
         columns = candles['columns']
@@ -48,39 +90,105 @@ def main():
         df = pd.DataFrame(data, columns=columns)
         df['date'] = pd.to_datetime(df['date'])
         df.set_index('date', inplace=True)
+        return df
 
-        # Get last datetime from freqtrade
-        last_freqtrade_timestamp = df.index[-1]  # Last index
 
-        # Get last datetime in Timestream
-        last_timestream_timestamp = get_last_timestream_timestamp(
-            timestream_query_client, database_name, table_name, pair, exchange, strategy_timeframe
-        )
+def run_updater(freqtrade_client, timestream_write_client, timestream_query_client, database_name, table_name,
+                strategy, pairs, exchange, clock=None, stop_at=None, candle_source=None):
+    """
+    Copy new candles of every pair from freqtrade to Timestream, forever or until clock.now() reaches stop_at.
+    Candles come from candle_source (anything with candles(pair, timeframe, limit)), by default the REST API.
+    """
+    clock = clock or SystemClock()
+    candle_source = candle_source or RestCandleSource(freqtrade_client)
+    strategy_timeframe = freqtrade_client.strategy(strategy)["timeframe"]
+
+    # Get the status of the bot (should log "pong" if ok)
+    logging.info(freqtrade_client.ping())
 
-        # Log timestamps
-        logging.info(f"Last recorded timestamp in Timestream: {last_timestream_timestamp}")
-        logging.info(f"Last recorded timestamp from Freqtrade: {last_freqtrade_timestamp}")
+    # Keys already written, so overlapping re-sends are dropped before reaching Timestream
+    written_filter = WrittenKeyFilter()
+    rollups = RollupAggregator(strategy_timeframe, ROLLUP_TIMEFRAMES, ROLLUP_INDICATORS)
 
-        # Wait for new data (not in timestream) to become available
-        second_last_freqtrade_timestamp = df.index[-2]
-        time_difference = (last_freqtrade_timestamp - second_last_freqtrade_timestamp).total_seconds()
-        wait_for_safe_time(last_timestream_timestamp, time_difference)
+    while stop_at is None or clock.now() < stop_at:
+        logging.info("Starting loop")
+        for pair in pairs:
+            update_pair(
+                candle_source, timestream_write_client, timestream_query_client, database_name, table_name,
+                strategy_timeframe, pair, exchange, written_filter, rollups, clock
+            )
 
-        # Trim dataframe to data after last Timestream datetime
-        # If no last_timestream_timestamp, dont trim dataframe
-        if last_timestream_timestamp:
-            df = df[df.index > last_timestream_timestamp]
-            if df.empty:
-                logging.info("No new data to write. Waiting for next cycle...")
-                continue  # Skip this iteration
 
-        # Push latest Freqtrade data to Timestream
+def update_pair(candle_source, timestream_write_client, timestream_query_client, database_name, table_name,
+                strategy_timeframe, pair, exchange, written_filter, rollups, clock):
+    # get data from freqtrade
+    df = candle_source.candles(pair, strategy_timeframe, 10)
+
+    # Get last datetime from freqtrade
+    last_freqtrade_timestamp = df.index[-1]  # Last index
+
+    # Get last datetime in Timestream
+    last_timestream_timestamp = get_last_timestream_timestamp(
+        timestream_query_client, database_name, table_name, pair, exchange, strategy_timeframe
+    )
+
+    # Log timestamps
+    logging.info(f"Last recorded timestamp in Timestream: {last_timestream_timestamp}")
+    logging.info(f"Last recorded timestamp from Freqtrade: {last_freqtrade_timestamp}")
+
+    # Wait for new data (not in timestream) to become available
+    second_last_freqtrade_timestamp = df.index[-2]
+    time_difference = (last_freqtrade_timestamp - second_last_freqtrade_timestamp).total_seconds()
+    wait_for_safe_time(last_timestream_timestamp, time_difference, clock)
+
+    # Trim dataframe to data after last Timestream datetime
+    # If no last_timestream_timestamp, dont trim dataframe
+    if last_timestream_timestamp:
+        df = df[df.index > last_timestream_timestamp]
+        if df.empty:
+            logging.info("No new data to write. Waiting for next cycle...")
+            return  # Skip this iteration
+
+    # Push latest Freqtrade data to Timestream
+    failed = []
+    write_records_to_timestream(
+        timestream_write_client, database_name, table_name, df, strategy_timeframe, pair, exchange,
+        written_filter, failed
+    )
+
+    # Only roll up candles that are stored; failed ones are rolled up when they are re-sent
+    if failed:
+        failed_ms = np.array(sorted({int(record["Time"]) for record in failed}), dtype=np.int64)
+        candle_ms = np.asarray((df.index - EPOCH) // pd.Timedelta(milliseconds=1), dtype=np.int64)
+        df = df[~np.isin(candle_ms, failed_ms)]
+
+    # After a (re)start, rebuild the buckets in progress from the candles already stored
+    rollup_input = df
+    if not rollups.has_state(pair) and last_timestream_timestamp is not None and not df.empty:
+        history = get_timestream_candles(
+            timestream_query_client, database_name, table_name, pair, exchange, strategy_timeframe,
+            rollups.history_start(df.index[0]), last_timestream_timestamp,
+            ["open", "high", "low", "close", "volume"] + ROLLUP_INDICATORS
+        )
+        logging.info(f"Seeding rollups of {pair} with {len(history)} stored candles.")
+        if len(history):
+            rollup_input = pd.concat([history, df[history.columns.intersection(df.columns)]])
+
+    # Write every rolled-up bucket that the new candles completed
+    for rollup_timeframe, rollup_df in rollups.update(pair, rollup_input).items():
+        logging.info(f"Writing {len(rollup_df)} finished {rollup_timeframe} rollup buckets.")
         write_records_to_timestream(
-            timestream_write_client, database_name, table_name, df, strategy_timeframe, pair, exchange
+            timestream_write_client, database_name, table_name, rollup_df, rollup_timeframe, pair, exchange,
+            written_filter
         )
 
 
-def write_records_to_timestream(client, database_name, table_name, df, strategy_timeframe, pair, exchange):
+def write_records_to_timestream(client, database_name, table_name, df, strategy_timeframe, pair, exchange,
+                                written_filter=None, failed=None):
+    """
+    Write one record per cell of df. Returns the number of records now stored in Timestream.
+    Records that could not be stored are appended to failed, if given.
+    """
     records = []
     # Determine column data types dynamically
     for timestamp, row in df.iterrows():
@@ -115,24 +223,14 @@ def write_records_to_timestream(client, database_name, table_name, df, strategy_
                 "MeasureValue": measure["MeasureValue"],
                 "MeasureValueType": measure["MeasureValueType"],
                 "Time": str(int(timestamp.timestamp() * 1000)),  # Convert timestamp to milliseconds
-                "TimeUnit": "MILLISECONDS"
+                "TimeUnit": "MILLISECONDS",
+                "Version": CANDLE_RECORD_VERSION
             }
             records.append(record)
-            # Write records in batches of 100
-            if len(records) == 100:
-                try:
-                    client.write_records(DatabaseName=database_name, TableName=table_name, Records=records)
-                    logging.info("Batch of 100 records written successfully.")
-                except ClientError as e:
-                    logging.error(f"Error writing records: {e}")
-                records = []  # Reset batch
-    # Write any remaining records
-    if records:
-        try:
-            client.write_records(DatabaseName=database_name, TableName=table_name, Records=records)
-            logging.info("Final batch of records written successfully.")
-        except ClientError as e:
-            logging.error(f"Error writing final records: {e}")
+
+    # Write records in batches of 100
+    return write_record_batches(client, database_name, table_name, records, written_filter=written_filter,
+                                failed=failed)
 
 
 def get_last_timestream_timestamp(timestream_query_client, database_name, table_name, pair, exchange, strategy_timeframe):
@@ -168,13 +266,57 @@ def get_last_timestream_timestamp(timestream_query_client, database_name, table_
     return None  # Return None if no data found
 
 
-def wait_for_safe_time(last_time, time_difference):
+def get_timestream_candles(timestream_query_client, database_name, table_name, pair, exchange, timeframe,
+                           start, end, columns):
+    """
+    Read stored candles back from Timestream, between start and end inclusive, as a DataFrame
+    indexed by date with the given (numeric) columns. Values stored as "None" come back as NaN.
+    """
+    measure_names = ", ".join(f"'{col}'" for col in columns)
+    start_ms = (start - EPOCH) // pd.Timedelta(milliseconds=1)
+    end_ms = (end - EPOCH) // pd.Timedelta(milliseconds=1)
+    query = f"""
+    SELECT to_milliseconds(time) AS t, measure_name, measure_value::double AS v
+    FROM "{database_name}"."{table_name}"
+    WHERE asset = '{pair}'
+      AND exchange = '{exchange}'
+      AND granularity = '{timeframe}'
+      AND measure_name IN ({measure_names})
+      AND time BETWEEN from_milliseconds({start_ms}) AND from_milliseconds({end_ms})
+    """
+    rows = []
+    kwargs = {"QueryString": query}
+    try:
+        while True:
+            response = timestream_query_client.query(**kwargs)
+            for row in response.get("Rows", []):
+                data = row["Data"]
+                value = data[2].get("ScalarValue")
+                rows.append((int(data[0]["ScalarValue"]), data[1]["ScalarValue"],
+                             float(value) if value is not None else np.nan))
+            if "NextToken" not in response:
+                break
+            kwargs["NextToken"] = response["NextToken"]
+    except ClientError as e:
+        logging.error(f"Error querying Timestream: {e}")
+        rows = []
+
+    df = pd.DataFrame(rows, columns=["t", "measure_name", "v"]).drop_duplicates(["t", "measure_name"])
+    df = df.pivot(index="t", columns="measure_name", values="v").reindex(columns=columns)
+    df.index = pd.to_datetime(df.index.astype(np.int64), unit="ms", utc=True).rename("date")
+    # A volume of 0 is stored as "None" by write_records_to_timestream
+    df["volume"] = df["volume"].fillna(0.0)
+    return df.sort_index()
+
+
+def wait_for_safe_time(last_time, time_difference, clock=None):
     """
     Pauses execution until the current time is at least 5 seconds past the next minute.
     """
     if last_time is None:
         return
-    current_time = datetime.now().astimezone()  # Get the current time
+    clock = clock or SystemClock()
+    current_time = clock.now()  # Get the current time
     logging.info(f"Current time: {current_time.strftime('%H:%M:%S')}")
     # Calculate the target time (doubled to accommodate for open vs close time and
     # extra 5 seconds for data to be surely available)
@@ -183,10 +325,10 @@ def wait_for_safe_time(last_time, time_difference):
     if target_time > current_time:
         waiting_time = (target_time - current_time).total_seconds()  # Convert timedelta to seconds
         logging.info(f"Waiting for {waiting_time} seconds until {target_time.strftime('%H:%M:%S')}.")
-        time.sleep(waiting_time)  # Sleep for the calculated time
+        clock.sleep(waiting_time)  # Sleep for the calculated time
     else:
         logging.info(f"Detected target time before current time, waiting for 1 second,")
-        time.sleep(1)
+        clock.sleep(1)
 
 
 if __name__ == "__main__":
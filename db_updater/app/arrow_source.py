@@ -0,0 +1,135 @@
+import logging
+import os
+from pathlib import Path
+
+import pyarrow as pa
+
+
+def export_path(directory, pair, timeframe):
+    """
+    Arrow file written by the strategy's ArrowExportMixin (BTC/USDT -> BTC_USDT-5m.arrow).
+    """
+    return Path(directory) / f"{pair.replace('/', '_').replace(':', '_')}-{timeframe}.arrow"
+
+
+class ArrowStreamTail:
+    """
+    Follows one Arrow IPC stream file that is appended to by another process.
+    Each read memory-maps the file and decodes only the record batches added since the last read,
+    without copying their data. Only the newest keep_rows rows are held.
+    """
+
+    def __init__(self, path, keep_rows=500):
+        self.path = Path(path)
+        self.keep_rows = keep_rows
+        self._inode = None
+        self._offset = 0
+        self._schema = None
+        self._batches = []
+
+    def read(self, limit=None):
+        """
+        Return a table of the newest rows (at most limit, or keep_rows), or None if the file does not exist.
+        """
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        if stat.st_ino != self._inode or stat.st_size < self._offset:
+            # The writer replaced the file (rotation or schema change): start over
+            self._inode = stat.st_ino
+            self._offset = 0
+            self._schema = None
+            self._batches = []
+        if stat.st_size > self._offset:
+            self._read_new_messages()
+        if self._schema is None:
+            return None
+
+        # Only combine the batches that hold the requested rows
+        batches, rows = [], 0
+        for batch in reversed(self._batches):
+            if limit and rows >= limit:
+                break
+            batches.insert(0, batch)
+            rows += batch.num_rows
+        table = pa.Table.from_batches(batches, schema=self._schema)
+        if limit:
+            table = table.slice(max(table.num_rows - limit, 0))
+        return table
+
+    def _read_new_messages(self):
+        # Batches keep referencing the mapping after the file object is closed
+        with pa.memory_map(str(self.path)) as source:
+            source.seek(self._offset)
+            while True:
+                try:
+                    message = pa.ipc.read_message(source)
+                except EOFError:
+                    break
+                except (pa.ArrowInvalid, OSError):
+                    # A message that is still being written (torn metadata raises ArrowInvalid,
+                    # a torn body OSError); keep the offset before it and read it next time
+                    break
+                if self._schema is None:
+                    self._schema = pa.ipc.read_schema(message)
+                else:
+                    self._batches.append(pa.ipc.read_record_batch(message, self._schema))
+                self._offset = source.tell()
+
+        # Drop batches that only hold rows older than the newest keep_rows
+        rows = sum(batch.num_rows for batch in self._batches)
+        while self._batches and rows - self._batches[0].num_rows >= self.keep_rows:
+            rows -= self._batches.pop(0).num_rows
+
+
+class ArrowCandleSource:
+    """
+    Reads the analyzed candles of a pair from the Arrow files exported by the strategy, on the
+    shared user_data volume, instead of fetching them as JSON from the freqtrade REST API.
+    Pairs without an export file are fetched from the fallback source, if given.
+    """
+
+    def __init__(self, directory, fallback=None, keep_rows=500):
+        self.directory = Path(directory)
+        self.fallback = fallback
+        self.keep_rows = keep_rows
+        self._tails = {}
+
+    def candles(self, pair, timeframe, limit=None):
+        """
+        Return the newest candles (at most limit) as a DataFrame indexed by date.
+        """
+        key = (pair, timeframe)
+        if key not in self._tails:
+            self._tails[key] = ArrowStreamTail(export_path(self.directory, pair, timeframe), self.keep_rows)
+        table = self._tails[key].read(limit)
+        if table is None:
+            if self.fallback is None:
+                raise FileNotFoundError(f"No Arrow export for {pair} {timeframe} in {self.directory}")
+            logging.warning(f"No Arrow export for {pair} {timeframe}, fetching candles from the fallback source.")
+            return self.fallback.candles(pair, timeframe, limit)
+        return table.to_pandas().set_index("date")
+
+
+if __name__ == "__main__":
+    # Check that a reader racing the writer's append never fails: python3 arrow_source.py
+    import tempfile
+    import pandas as pd
+
+    frame = pd.DataFrame({"date": pd.date_range("2024-01-01", periods=3, freq="5min", tz="UTC"),
+                          "close": [1.0, 2.0, 3.0]})
+    schema = pa.Schema.from_pandas(frame, preserve_index=False)
+    head = pa.RecordBatch.from_pandas(frame.iloc[:2], schema=schema, preserve_index=False).serialize().to_pybytes()
+    tail = pa.RecordBatch.from_pandas(frame.iloc[2:], schema=schema, preserve_index=False).serialize().to_pybytes()
+    with tempfile.TemporaryDirectory() as directory:
+        path = export_path(directory, "BTC/USDT", "5m")
+        for cut in range(len(tail)):
+            path.write_bytes(schema.serialize().to_pybytes() + head + tail[:cut])
+            source = ArrowCandleSource(directory)
+            assert list(source.candles("BTC/USDT", "5m")["close"]) == [1.0, 2.0], cut
+            # Completing the append makes the torn batch readable
+            with open(path, "ab") as f:
+                f.write(tail[cut:])
+            assert list(source.candles("BTC/USDT", "5m")["close"]) == [1.0, 2.0, 3.0], cut
+    print(f"Torn appends handled at all {len(tail)} cut points.")
@@ -0,0 +1,247 @@
+import argparse
+import json
+import logging
+import os
+import time
+import zipfile
+from contextlib import contextmanager
+from pathlib import Path
+
+import boto3
+import ijson
+import numpy as np
+import pandas as pd
+
+from timestream import enable_magnetic_store_writes, write_record_batches
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Sections of a strategy's backtest result that are flattened into rows
+SECTIONS = ("trades", "results_per_pair")
+
+# Results are immutable once written, so every (re-)ingestion uses the same version
+BACKTEST_RECORD_VERSION = 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest freqtrade backtest results into Timestream.")
+    parser.add_argument("--results-dir", default="/freqtrade/user_data/backtest_results")
+    parser.add_argument("--state-path", default="backtest_ingest_state.json")
+    parser.add_argument("--poll-interval", type=float, default=60)
+    parser.add_argument("--chunk-size", type=int, default=5000, help="Rows flattened per bulk write")
+    parser.add_argument("--once", action="store_true", help="Ingest pending files and exit instead of watching")
+    parser.add_argument("--database", required=True, help="Existing Timestream database name")
+    parser.add_argument("--table", required=True, help="Existing Timestream table to ingest into")
+    parser.add_argument("--region", default="eu-west-1")
+    args = parser.parse_args()
+
+    database_name = args.database
+    table_name = args.table
+    timestream_write_client = boto3.client("timestream-write", region_name=args.region)
+
+    # Backtest trades carry historical open dates, far older than the memory store retention
+    enable_magnetic_store_writes(timestream_write_client, database_name, table_name)
+
+    processed = load_processed_files(args.state_path)
+    while True:
+        for path in find_new_result_files(args.results_dir, processed):
+            logging.info(f"Ingesting backtest result {path.name}")
+            ingested = ingest_result_file(path, timestream_write_client, database_name, table_name, args.chunk_size)
+            if ingested:
+                processed.add(path.name)
+                save_processed_files(args.state_path, processed)
+        if args.once:
+            break
+        time.sleep(args.poll_interval)
+
+
+def load_processed_files(state_path):
+    if os.path.exists(state_path):
+        with open(state_path) as f:
+            return set(json.load(f))
+    return set()
+
+
+def save_processed_files(state_path, processed):
+    tmp_path = f"{state_path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(sorted(processed), f)
+    os.replace(tmp_path, state_path)
+
+
+def find_new_result_files(results_dir, processed, settle_seconds=10):
+    """
+    List backtest result files (zipped or plain JSON) that were not ingested yet.
+    Files modified in the last settle_seconds are skipped as freqtrade may still be writing them.
+    """
+    now = time.time()
+    files = []
+    for path in sorted(Path(results_dir).glob("backtest-result-*")):
+        if path.name in processed or not is_result_file(path.name):
+            continue
+        if now - path.stat().st_mtime < settle_seconds:
+            continue
+        files.append(path)
+    return files
+
+
+def is_result_file(name):
+    if name.endswith(".zip"):
+        return True
+    return name.endswith(".json") and not name.endswith((".meta.json", "_config.json"))
+
+
+@contextmanager
+def open_result_stream(path):
+    """
+    Open the results JSON of a backtest file as a binary stream, without extracting the archive.
+    """
+    if path.suffix != ".zip":
+        with open(path, "rb") as stream:
+            yield stream
+        return
+    with zipfile.ZipFile(path) as archive:
+        with archive.open(f"{path.stem}.json") as stream:
+            yield stream
+
+
+def load_run_metadata(path):
+    """
+    Read the small .meta.json written next to each result, mapping strategy name to run metadata.
+    """
+    meta_path = path.with_name(path.name.split(".")[0] + ".meta.json")
+    if meta_path.exists():
+        with open(meta_path) as f:
+            return json.load(f)
+    return {}
+
+
+def iter_result_rows(stream):
+    """
+    Stream-parse a backtest result and yield (strategy, section, row) for every trade and
+    per-pair result, keeping only one row in memory at a time.
+    """
+    builder = None
+    for prefix, event, value in ijson.parse(stream, use_float=True):
+        if builder is None:
+            if event != "start_map" or not prefix.endswith(".item"):
+                continue
+            parts = prefix.split(".")
+            if len(parts) != 4 or parts[0] != "strategy" or parts[2] not in SECTIONS:
+                continue
+            strategy, section = parts[1], parts[2]
+            builder = ijson.ObjectBuilder()
+            depth = 0
+        builder.event(event, value)
+        if event in ("start_map", "start_array"):
+            depth += 1
+        elif event in ("end_map", "end_array"):
+            depth -= 1
+            if depth == 0:
+                yield strategy, section, builder.value
+                builder = None
+
+
+def ingest_result_file(path, client, database_name, table_name, chunk_size):
+    """
+    Flatten the trades and per-pair stats of one backtest result into columnar chunks and bulk
+    write them, keyed by strategy and run id. Returns True if every record was stored or
+    rejected for good, i.e. if re-ingesting the file would not store anything more.
+    """
+    metadata = load_run_metadata(path)
+    buffers = {}
+    counts = {}
+    stored = True
+    with open_result_stream(path) as stream:
+        for strategy, section, row in iter_result_rows(stream):
+            buffer = buffers.setdefault((strategy, section), [])
+            buffer.append(row)
+            if len(buffer) >= chunk_size:
+                stored &= flush_rows(client, database_name, table_name, path, metadata, strategy, section,
+                                     buffer, counts.get((strategy, section), 0))
+                counts[(strategy, section)] = counts.get((strategy, section), 0) + len(buffer)
+                buffers[(strategy, section)] = []
+    for (strategy, section), buffer in buffers.items():
+        if buffer:
+            stored &= flush_rows(client, database_name, table_name, path, metadata, strategy, section,
+                                 buffer, counts.get((strategy, section), 0))
+            counts[(strategy, section)] = counts.get((strategy, section), 0) + len(buffer)
+    logging.info(f"Ingested {path.name}: {counts}")
+    return stored
+
+
+def flush_rows(client, database_name, table_name, path, metadata, strategy, section, rows, offset):
+    """
+    Convert a chunk of rows to a flat DataFrame and write it to Timestream.
+    Returns False if some records failed for a retryable reason.
+    """
+    strategy_meta = metadata.get(strategy, {})
+    run_id = strategy_meta.get("run_id") or path.name.split(".")[0]
+    run_time = pd.to_datetime(strategy_meta.get("backtest_start_time") or path.stat().st_mtime, unit="s", utc=True)
+
+    df = flatten_rows(rows)
+    if section == "trades":
+        times = pd.to_datetime(df["open_date"], utc=True)
+        row_ids = pd.Series(np.arange(offset, offset + len(df)), index=df.index).astype(str)
+        asset = df["pair"]
+    else:
+        times = pd.Series(run_time, index=df.index)
+        row_ids = df["key"]
+        asset = df["key"]
+    dimensions = {"strategy": strategy, "run_id": run_id, "record_type": f"backtest_{section}"}
+    records = frame_to_records(df.drop(columns=["pair", "key"], errors="ignore"), times, asset, row_ids, dimensions)
+    rejected = []
+    written = write_record_batches(client, database_name, table_name, records, rejected=rejected)
+    if rejected:
+        logging.error(f"{len(rejected)} {section} records of {path.name} were rejected permanently.")
+    return written + len(rejected) == len(records)
+
+
+def flatten_rows(rows):
+    """
+    Turn a list of result dicts into a columnar DataFrame, dropping nested values like order lists.
+    """
+    df = pd.DataFrame.from_records(rows)
+    nested = [col for col in df.columns if df[col].map(lambda v: isinstance(v, (list, dict))).any()]
+    return df.drop(columns=nested)
+
+
+def frame_to_records(df, times, asset, row_ids, dimensions):
+    """
+    Build one Timestream record per non-null cell, column by column.
+    """
+    time_ms = ((times - pd.Timestamp(0, tz="UTC")) // pd.Timedelta(milliseconds=1)).astype(str)
+    static_dimensions = [{"Name": name, "Value": value} for name, value in dimensions.items()]
+    row_dimensions = [
+        static_dimensions + [{"Name": "asset", "Value": str(a)}, {"Name": "row_id", "Value": str(r)}]
+        for a, r in zip(asset, row_ids)
+    ]
+    records = []
+    for col_name in df.columns:
+        column = df[col_name]
+        if pd.api.types.is_bool_dtype(column):
+            measure_type, values = "BOOLEAN", column.astype(str).str.lower()
+        elif pd.api.types.is_numeric_dtype(column):
+            measure_type, values = "DOUBLE", column.astype(float).map(repr)
+        else:
+            measure_type, values = "VARCHAR", column.astype(str)
+        valid = column.notna().to_numpy()
+        if measure_type == "DOUBLE":
+            # Not in place: the notna() mask can be a read-only view under copy-on-write
+            valid = valid & np.isfinite(column.to_numpy(dtype=float, na_value=np.nan))
+        for i in np.flatnonzero(valid):
+            records.append({
+                "Dimensions": row_dimensions[i],
+                "MeasureName": col_name,
+                "MeasureValue": values.iat[i],
+                "MeasureValueType": measure_type,
+                "Time": time_ms.iat[i],
+                "TimeUnit": "MILLISECONDS",
+                "Version": BACKTEST_RECORD_VERSION
+            })
+    return records
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+import argparse
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from pathlib import Path
+
+import boto3
+import numpy as np
+import pandas as pd
+from freqtrade_client import FtRestClient
+
+from app import write_records_to_timestream
+from timeframes import TIMEFRAME_UNITS_MS, timeframe_to_ms
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find and backfill missing candles in Timestream.")
+    parser.add_argument("--pairs", nargs="*", help="Pairs to check (default: current freqtrade whitelist)")
+    parser.add_argument("--timeframe", help="Candle timeframe (default: the strategy timeframe)")
+    parser.add_argument("--exchange", default="Binance")
+    parser.add_argument("--strategy", default="SampleStrategy")
+    parser.add_argument("--days", type=float, default=7, help="How far back to scan")
+    parser.add_argument("--chunk-days", type=float, default=1, help="Size of each time partition scanned")
+    parser.add_argument("--source", choices=["freqtrade", "files"], default="freqtrade",
+                        help="Backfill from freqtrade's analyzed history or from local OHLCV files")
+    parser.add_argument("--data-dir", default="/freqtrade/user_data/data/binance")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--dry-run", action="store_true", help="Only report gaps, don't backfill")
+    parser.add_argument("--database", required=True, help="Timestream database of the candle table")
+    parser.add_argument("--table", required=True, help="Timestream table the updater writes candles to")
+    parser.add_argument("--region", default="eu-west-1")
+    args = parser.parse_args()
+
+    database_name = args.database
+    table_name = args.table
+    timestream_write_client = boto3.client("timestream-write", region_name=args.region)
+    timestream_query_client = boto3.client("timestream-query", region_name=args.region)
+
+    freqtrade_client = FtRestClient("http://127.0.0.1:8080", "freqtrader", "1234")
+    timeframe = args.timeframe or freqtrade_client.strategy(args.strategy)["timeframe"]
+    pairs = args.pairs or freqtrade_client.whitelist()["whitelist"]
+
+    # Only closed candles are expected to be stored
+    step = timeframe_to_ms(timeframe)
+    end_ms = int(datetime.now(timezone.utc).timestamp() * 1000) // step * step - step
+    start_ms = end_ms - int(timedelta(days=args.days).total_seconds() * 1000) // step * step
+
+    gaps = {}
+    for pair in pairs:
+        gaps[pair] = scan_series_gaps(
+            timestream_query_client, database_name, table_name, pair, args.exchange, timeframe,
+            start_ms, end_ms, int(args.chunk_days * TIMEFRAME_UNITS_MS["d"]), args.workers
+        )
+        logging.info(f"{pair}: {len(gaps[pair])} gaps, {sum(count_candles(g, step) for g in gaps[pair])} missing candles")
+
+    if args.dry_run:
+        return
+
+    if args.source == "freqtrade":
+        def fetch(pair, gap_start, gap_end):
+            return fetch_freqtrade_candles(freqtrade_client, pair, timeframe, args.strategy, gap_start, gap_end)
+    else:
+        # Each pair's file is read once and shared by all its gaps
+        cached_load = lru_cache(maxsize=None)(load_local_candles)
+
+        def fetch(pair, gap_start, gap_end):
+            return cached_load(args.data_dir, pair, timeframe)
+
+    report = repair_gaps(
+        gaps, fetch, timestream_write_client, database_name, table_name, timeframe, args.exchange, args.workers
+    )
+    log_repair_report(report)
+
+
+def count_candles(gap, step):
+    return (gap[1] - gap[0]) // step + 1
+
+
+def query_series_timestamps(timestream_query_client, database_name, table_name, pair, exchange, timeframe,
+                            start_ms, end_ms):
+    """
+    Return the sorted candle timestamps (ms) stored for one series between start_ms and end_ms inclusive.
+    """
+    query = f"""
+    SELECT to_milliseconds(time) AS t
+    FROM "{database_name}"."{table_name}"
+    WHERE asset = '{pair}'
+      AND exchange = '{exchange}'
+      AND granularity = '{timeframe}'
+      AND measure_name = 'close'
+      AND time BETWEEN from_milliseconds({start_ms}) AND from_milliseconds({end_ms})
+    ORDER BY time
+    """
+    timestamps = []
+    paginator = timestream_query_client.get_paginator("query")
+    for page in paginator.paginate(QueryString=query):
+        timestamps.extend(int(row["Data"][0]["ScalarValue"]) for row in page["Rows"])
+    return np.unique(np.asarray(timestamps, dtype=np.int64))
+
+
+def find_missing_intervals(timestamps, start_ms, end_ms, step):
+    """
+    Compare timestamps against the timeframe grid from start_ms to end_ms (inclusive) and return the
+    missing intervals as (first_missing_ms, last_missing_ms) tuples, using a vectorized diff.
+    """
+    bounded = np.concatenate(([start_ms - step], timestamps, [end_ms + step]))
+    jumps = np.flatnonzero(np.diff(bounded) > step)
+    return [(int(bounded[i] + step), int(bounded[i + 1] - step)) for i in jumps]
+
+
+def scan_series_gaps(timestream_query_client, database_name, table_name, pair, exchange, timeframe,
+                     start_ms, end_ms, chunk_ms, workers):
+    """
+    Scan one series in time-partitioned chunks in parallel and return its merged missing intervals.
+    """
+    step = timeframe_to_ms(timeframe)
+    chunk_ms = max(chunk_ms // step, 1) * step
+    partitions = [(s, min(s + chunk_ms - step, end_ms)) for s in range(start_ms, end_ms + 1, chunk_ms)]
+
+    def scan(partition):
+        timestamps = query_series_timestamps(
+            timestream_query_client, database_name, table_name, pair, exchange, timeframe, *partition
+        )
+        return find_missing_intervals(timestamps, *partition, step)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        partition_gaps = list(executor.map(scan, partitions))
+
+    # Join gaps that were split at partition boundaries
+    gaps = []
+    for gap in (g for chunk in partition_gaps for g in chunk):
+        if gaps and gaps[-1][1] + step == gap[0]:
+            gaps[-1] = (gaps[-1][0], gap[1])
+        else:
+            gaps.append(gap)
+    return gaps
+
+
+def fetch_freqtrade_candles(freqtrade_client, pair, timeframe, strategy, gap_start, gap_end):
+    """
+    Fetch analyzed candles covering a gap from freqtrade's pair_history endpoint.
+    """
+    step = timeframe_to_ms(timeframe)
+    timerange = f"{gap_start // 1000}-{(gap_end + step) // 1000}"
+    candles = freqtrade_client.pair_history(pair, timeframe, strategy, timerange)
+    df = pd.DataFrame(candles['data'], columns=candles['columns'])
+    df['date'] = pd.to_datetime(df['date'], utc=True)
+    return df.set_index('date')
+
+
+def load_local_candles(data_dir, pair, timeframe):
+    """
+    Load raw OHLCV candles from freqtrade's downloaded data (feather or json format).
+    """
+    stem = Path(data_dir) / f"{pair.replace('/', '_')}-{timeframe}"
+    if stem.with_suffix(".feather").exists():
+        df = pd.read_feather(stem.with_suffix(".feather"))
+        df['date'] = pd.to_datetime(df['date'], utc=True)
+    else:
+        df = pd.read_json(stem.with_suffix(".json"))
+        df.columns = ["date", "open", "high", "low", "close", "volume"]
+        df['date'] = pd.to_datetime(df['date'], unit="ms", utc=True)
+    return df.set_index('date')
+
+
+def repair_gaps(gaps, fetch, timestream_write_client, database_name, table_name, timeframe, exchange, workers):
+    """
+    Backfill every gap in parallel and return one report entry per gap.
+    fetch(pair, gap_start_ms, gap_end_ms) must return a date-indexed candle DataFrame.
+    """
+    step = timeframe_to_ms(timeframe)
+
+    def repair(pair, gap):
+        start = pd.Timestamp(gap[0], unit="ms", tz="UTC")
+        end = pd.Timestamp(gap[1], unit="ms", tz="UTC")
+        try:
+            df = fetch(pair, *gap)
+            df = df[(df.index >= start) & (df.index <= end)]
+            filled, error = 0, None
+            if not df.empty:
+                stored = write_records_to_timestream(
+                    timestream_write_client, database_name, table_name, df, timeframe, pair, exchange
+                )
+                # Every candle is one record per column; only count candles that were fully stored
+                filled = stored // len(df.columns)
+        except Exception as e:
+            filled, error = 0, str(e)
+        return {"pair": pair, "start": start, "end": end, "missing": count_candles(gap, step),
+                "filled": filled, "error": error}
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(repair, pair, gap) for pair, pair_gaps in gaps.items() for gap in pair_gaps]
+        return [future.result() for future in futures]
+
+
+def log_repair_report(report):
+    missing = sum(entry["missing"] for entry in report)
+    filled = sum(entry["filled"] for entry in report)
+    for entry in report:
+        message = (f"{entry['pair']} {entry['start']} -> {entry['end']}: "
+                   f"filled {entry['filled']}/{entry['missing']} candles")
+        if entry["error"]:
+            logging.error(f"{message} ({entry['error']})")
+        elif entry["filled"] < entry["missing"]:
+            logging.warning(f"{message} (not in the source or not stored, see errors above)")
+        else:
+            logging.info(message)
+    logging.info(f"Repaired {filled}/{missing} missing candles across {len(report)} gaps.")
+
+
+if __name__ == "__main__":
+    main()
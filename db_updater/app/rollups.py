@@ -0,0 +1,136 @@
+import logging
+
+import numpy as np
+import pandas as pd
+
+from timeframes import timeframe_to_ms
+
+EPOCH = pd.Timestamp(0, tz="UTC")
+
+
+class RollupAggregator:
+    """
+    Incrementally rolls base candles up into higher-timeframe OHLCV buckets, plus the last and
+    mean value of selected indicator columns.
+    Only one partial bucket per (pair, rollup timeframe) is kept in memory. A bucket is returned
+    exactly once, as soon as its last base candle arrives; buckets missing candles (e.g. the
+    first one after a start mid-bucket) are skipped rather than written with wrong values.
+    """
+
+    def __init__(self, base_timeframe, rollup_timeframes=("1h", "4h", "1d"), indicator_columns=()):
+        self.base_ms = timeframe_to_ms(base_timeframe)
+        self.rollup_timeframes = [tf for tf in rollup_timeframes if timeframe_to_ms(tf) > self.base_ms]
+        self.indicator_columns = list(indicator_columns)
+        self._partials = {}
+        self._last_dates = {}
+
+    def has_state(self, pair):
+        """
+        True once candles of this pair were fed, i.e. its partial buckets are in memory.
+        """
+        return pair in self._last_dates
+
+    def history_start(self, date):
+        """
+        Start of the longest rollup bucket containing date. After a restart, feeding the base
+        candles from there up to date rebuilds the partial buckets that were in progress.
+        """
+        longest_ms = max((timeframe_to_ms(tf) for tf in self.rollup_timeframes), default=self.base_ms)
+        date_ms = (date - EPOCH) // pd.Timedelta(milliseconds=1)
+        return EPOCH + pd.Timedelta(milliseconds=date_ms // longest_ms * longest_ms)
+
+    def update(self, pair, df):
+        """
+        Feed new base candles (date-indexed DataFrame, sorted by date) for a pair.
+        Returns {rollup_timeframe: DataFrame of finished buckets indexed by bucket start}.
+        """
+        # Ignore candles that were already aggregated, so overlapping re-sends are harmless
+        last_date = self._last_dates.get(pair)
+        if last_date is not None:
+            df = df[df.index > last_date]
+        if df.empty:
+            return {}
+        self._last_dates[pair] = df.index[-1]
+
+        times_ms = np.asarray((df.index - EPOCH) // pd.Timedelta(milliseconds=1), dtype=np.int64)
+        columns = {col: df[col].to_numpy(dtype=float) for col in ("open", "high", "low", "close", "volume")}
+        indicators = {col: df[col].to_numpy(dtype=float) for col in self.indicator_columns if col in df.columns}
+
+        finished = {}
+        for timeframe in self.rollup_timeframes:
+            rows = self._update_series(pair, timeframe, times_ms, columns, indicators)
+            if rows:
+                finished[timeframe] = pd.DataFrame(rows).set_index("date")
+        return finished
+
+    def _update_series(self, pair, timeframe, times_ms, columns, indicators):
+        bucket_ms = timeframe_to_ms(timeframe)
+
+        # Aggregate the new candles per bucket in one vectorized pass over contiguous runs
+        bucket_starts = times_ms // bucket_ms * bucket_ms
+        firsts = np.flatnonzero(np.r_[True, bucket_starts[1:] != bucket_starts[:-1]])
+        lasts = np.r_[firsts[1:], len(times_ms)] - 1
+        aggregated = {
+            "open": columns["open"][firsts],
+            "high": np.maximum.reduceat(columns["high"], firsts),
+            "low": np.minimum.reduceat(columns["low"], firsts),
+            "close": columns["close"][lasts],
+            "volume": np.add.reduceat(columns["volume"], firsts),
+            "candles": lasts - firsts + 1,
+            "last_ms": times_ms[lasts],
+        }
+        positions = np.arange(len(times_ms))
+        for col, values in indicators.items():
+            valid = ~np.isnan(values)
+            last_valid = np.maximum.reduceat(np.where(valid, positions, -1), firsts)
+            aggregated[f"{col}_sum"] = np.add.reduceat(np.where(valid, values, 0.0), firsts)
+            aggregated[f"{col}_count"] = np.add.reduceat(valid.astype(np.int64), firsts)
+            aggregated[f"{col}_last"] = np.where(last_valid >= firsts, values[last_valid], np.nan)
+
+        key = (pair, timeframe)
+        finished = []
+        for i, bucket_start in enumerate(bucket_starts[firsts]):
+            row = {name: values[i].item() for name, values in aggregated.items()}
+            partial = self._partials.get(key)
+            if partial is not None and partial["start_ms"] < bucket_start:
+                # A newer bucket started before this one was completed
+                self._log_incomplete(pair, timeframe, partial, bucket_ms)
+                partial = None
+            if partial is None:
+                partial = {"start_ms": int(bucket_start), **row}
+            else:
+                partial["high"] = max(partial["high"], row["high"])
+                partial["low"] = min(partial["low"], row["low"])
+                partial["close"] = row["close"]
+                partial["volume"] += row["volume"]
+                partial["candles"] += row["candles"]
+                partial["last_ms"] = row["last_ms"]
+                for col in indicators:
+                    partial[f"{col}_sum"] += row[f"{col}_sum"]
+                    partial[f"{col}_count"] += row[f"{col}_count"]
+                    if not np.isnan(row[f"{col}_last"]):
+                        partial[f"{col}_last"] = row[f"{col}_last"]
+            self._partials[key] = partial
+
+            if partial["last_ms"] + self.base_ms >= bucket_start + bucket_ms:
+                del self._partials[key]
+                if partial["candles"] == bucket_ms // self.base_ms:
+                    finished.append(self._finish_bucket(partial, indicators))
+                else:
+                    self._log_incomplete(pair, timeframe, partial, bucket_ms)
+        return finished
+
+    def _log_incomplete(self, pair, timeframe, partial, bucket_ms):
+        bucket_date = pd.Timestamp(partial["start_ms"], unit="ms", tz="UTC")
+        logging.warning(f"Skipping incomplete {timeframe} rollup for {pair} at {bucket_date}: "
+                        f"{partial['candles']}/{bucket_ms // self.base_ms} candles.")
+
+    @staticmethod
+    def _finish_bucket(partial, indicators):
+        bucket = {"date": pd.Timestamp(partial["start_ms"], unit="ms", tz="UTC")}
+        bucket.update({key: partial[key] for key in ("open", "high", "low", "close", "volume")})
+        for col in indicators:
+            count = partial[f"{col}_count"]
+            bucket[f"{col}_last"] = partial[f"{col}_last"]
+            bucket[f"{col}_mean"] = partial[f"{col}_sum"] / count if count else float("nan")
+        return bucket
@@ -0,0 +1,8 @@
+TIMEFRAME_UNITS_MS = {"m": 60_000, "h": 3_600_000, "d": 86_400_000, "w": 604_800_000}
+
+
+def timeframe_to_ms(timeframe):
+    """
+    Convert a freqtrade timeframe string like "5m" or "4h" to milliseconds.
+    """
+    return int(timeframe[:-1]) * TIMEFRAME_UNITS_MS[timeframe[-1]]
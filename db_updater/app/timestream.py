@@ -0,0 +1,156 @@
+import bisect
+import logging
+from botocore.exceptions import ClientError
+
+# Timestream accepts at most 100 records per WriteRecords call
+MAX_BATCH_SIZE = 100
+
+# Errors that reject a whole batch for good: re-sending the same records cannot succeed
+PERMANENT_ERROR_CODES = {"ValidationException"}
+
+
+class WrittenKeyFilter:
+    """
+    Local index of record keys already written to Timestream, used to drop duplicates before they
+    reach the network. Keys are kept as a sorted time index per series (dimensions + measure name),
+    together with the version that was written. Only the newest max_per_series times of each
+    series are kept; anything older is let through and made harmless by the record Version.
+    """
+
+    def __init__(self, max_per_series=10000):
+        self.max_per_series = max_per_series
+        self._times = {}
+        self._versions = {}
+
+    @staticmethod
+    def series_key(record):
+        dimensions = tuple((d["Name"], d["Value"]) for d in record["Dimensions"])
+        return dimensions, record["MeasureName"]
+
+    def contains(self, record):
+        """
+        True if this record (at the same or a newer version) was already written.
+        """
+        times = self._times.get(self.series_key(record))
+        if not times:
+            return False
+        record_time = int(record["Time"])
+        i = bisect.bisect_left(times, record_time)
+        if i == len(times) or times[i] != record_time:
+            return False
+        return self._versions[self.series_key(record)][i] >= record.get("Version", 0)
+
+    def add(self, record):
+        key = self.series_key(record)
+        times = self._times.setdefault(key, [])
+        versions = self._versions.setdefault(key, [])
+        record_time = int(record["Time"])
+        version = record.get("Version", 0)
+        # Records mostly arrive in time order, so appending is the common case
+        if not times or record_time > times[-1]:
+            times.append(record_time)
+            versions.append(version)
+        else:
+            i = bisect.bisect_left(times, record_time)
+            if i < len(times) and times[i] == record_time:
+                versions[i] = max(versions[i], version)
+            else:
+                times.insert(i, record_time)
+                versions.insert(i, version)
+        if len(times) > self.max_per_series:
+            excess = len(times) - self.max_per_series
+            del times[:excess]
+            del versions[:excess]
+
+
+def enable_magnetic_store_writes(client, database_name, table_name):
+    """
+    Allow writing records older than the table's memory store retention, like app.main does.
+    """
+    client.update_table(
+        DatabaseName=database_name,
+        TableName=table_name,
+        MagneticStoreWriteProperties={'EnableMagneticStoreWrites': True}
+    )
+
+
+def write_record_batches(client, database_name, table_name, records, batch_size=MAX_BATCH_SIZE,
+                         written_filter=None, rejected=None, failed=None):
+    """
+    Write records to Timestream in batches of at most batch_size records.
+    If a WrittenKeyFilter is given, records it already contains are dropped before sending and
+    successfully written records are added to it. Records rejected because Timestream already
+    holds the same or a newer version count as stored. Failed batches are logged and skipped.
+    If a list is given as rejected, records that Timestream refused for good (e.g. a measure
+    type conflict) are appended to it, so callers can tell them from retryable failures.
+    If a list is given as failed, every record that is not stored (for any reason) is appended.
+    Returns the number of records that are now stored (written or already present).
+    """
+    stored = 0
+    if written_filter is not None:
+        pending = [record for record in records if not written_filter.contains(record)]
+        stored += len(records) - len(pending)
+        if stored:
+            logging.info(f"Skipped {stored} records already written.")
+    else:
+        pending = records
+
+    for start in range(0, len(pending), batch_size):
+        batch = pending[start:start + batch_size]
+        try:
+            client.write_records(DatabaseName=database_name, TableName=table_name, Records=batch)
+            logging.info(f"Batch of {len(batch)} records written successfully.")
+            accepted = batch
+        except ClientError as e:
+            accepted = accepted_records(batch, e)
+            logging.error(f"Error writing records ({len(accepted)}/{len(batch)} stored): {e}")
+            if rejected is not None:
+                rejected.extend(permanently_rejected_records(batch, e))
+            if failed is not None:
+                stored_ids = {id(record) for record in accepted}
+                failed.extend(record for record in batch if id(record) not in stored_ids)
+        stored += len(accepted)
+        if written_filter is not None:
+            for record in accepted:
+                written_filter.add(record)
+    return stored
+
+
+def accepted_records(batch, error):
+    """
+    Return the records of a failed batch that are nevertheless stored in Timestream.
+    A RejectedRecordsException only rejects some records; the rest were written, and records
+    rejected because an equal or newer version already exists are duplicates.
+    """
+    if error.response.get("Error", {}).get("Code") != "RejectedRecordsException":
+        return []
+    rejected = set()
+    for rejection in error.response.get("RejectedRecords", []):
+        index = rejection["RecordIndex"]
+        existing_version = rejection.get("ExistingVersion")
+        if existing_version is None or existing_version < batch[index].get("Version", 0):
+            rejected.add(index)
+    return [record for i, record in enumerate(batch) if i not in rejected]
+
+
+def permanently_rejected_records(batch, error):
+    """
+    Return the records of a failed batch that Timestream will never accept as they are.
+    Individually rejected records (outside the retention, type conflicts, older versions) and
+    batches failing validation are permanent; throttling or service errors are worth retrying.
+    """
+    code = error.response.get("Error", {}).get("Code")
+    if code in PERMANENT_ERROR_CODES:
+        return list(batch)
+    if code != "RejectedRecordsException":
+        return []
+    rejected = []
+    for rejection in error.response.get("RejectedRecords", []):
+        record = batch[rejection["RecordIndex"]]
+        existing_version = rejection.get("ExistingVersion")
+        if existing_version is not None and existing_version >= record.get("Version", 0):
+            # Already stored at the same or a newer version
+            continue
+        logging.warning(f"Record {record['MeasureName']} at {record['Time']} rejected: {rejection.get('Reason')}")
+        rejected.append(record)
+    return rejected
@@ -0,0 +1,315 @@
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import time
+
+import boto3
+import pandas as pd
+
+from timestream import WrittenKeyFilter, enable_magnetic_store_writes, write_record_batches
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Columns exported from the freqtrade "trades" and "orders" tables, with their Timestream measure type.
+# NULL or missing values are skipped, so open trades simply carry fewer measures.
+TRADE_MEASURES = {
+    "is_open": "BIGINT",
+    "is_short": "BIGINT",
+    "open_rate": "DOUBLE",
+    "close_rate": "DOUBLE",
+    "amount": "DOUBLE",
+    "stake_amount": "DOUBLE",
+    "leverage": "DOUBLE",
+    "fee_open": "DOUBLE",
+    "fee_close": "DOUBLE",
+    "realized_profit": "DOUBLE",
+    "close_profit": "DOUBLE",
+    "close_profit_abs": "DOUBLE",
+    "stop_loss": "DOUBLE",
+    "max_rate": "DOUBLE",
+    "min_rate": "DOUBLE",
+    "close_date": "VARCHAR",
+    "enter_tag": "VARCHAR",
+    "exit_reason": "VARCHAR",
+}
+ORDER_MEASURES = {
+    "ft_is_open": "BIGINT",
+    "status": "VARCHAR",
+    "order_type": "VARCHAR",
+    "price": "DOUBLE",
+    "average": "DOUBLE",
+    "amount": "DOUBLE",
+    "filled": "DOUBLE",
+    "remaining": "DOUBLE",
+    "cost": "DOUBLE",
+    "stop_price": "DOUBLE",
+    "order_filled_date": "VARCHAR",
+    "order_update_date": "VARCHAR",
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export freqtrade trades and orders to Timestream.")
+    parser.add_argument("--db-path", default="/freqtrade/user_data/tradesv3.sqlite")
+    parser.add_argument("--state-path", default="trade_exporter_state.json")
+    parser.add_argument("--poll-interval", type=float, default=30)
+    parser.add_argument("--exchange", default="Binance")
+    parser.add_argument("--database", required=True, help="Existing Timestream database name")
+    parser.add_argument("--table", required=True, help="Existing Timestream table to export to")
+    parser.add_argument("--region", default="eu-west-1")
+    args = parser.parse_args()
+
+    database_name = args.database
+    table_name = args.table
+    timestream_write_client = boto3.client("timestream-write", region_name=args.region)
+
+    # Trades are written at their open date, which can be older than the memory store retention
+    enable_magnetic_store_writes(timestream_write_client, database_name, table_name)
+
+    connection = open_trades_db(args.db_path)
+    cursor_state = load_cursor_state(args.state_path)
+    written_filter = WrittenKeyFilter()
+
+    while True:
+        logging.info("Starting trade export")
+        cursor_state = export_trades_and_orders(
+            connection, timestream_write_client, database_name, table_name, cursor_state, args.exchange,
+            written_filter
+        )
+        save_cursor_state(args.state_path, cursor_state)
+        time.sleep(args.poll_interval)
+
+
+def open_trades_db(db_path):
+    """
+    Open the freqtrade trades database read-only.
+    In WAL mode our reads never block the bot's writes; in rollback-journal mode they briefly can,
+    and a read-only connection cannot switch the mode, so only warn about it.
+    """
+    connection = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, isolation_level=None, check_same_thread=False)
+    connection.row_factory = sqlite3.Row
+    connection.execute("PRAGMA query_only = 1")
+    journal_mode = connection.execute("PRAGMA journal_mode").fetchone()[0]
+    if journal_mode.lower() != "wal":
+        logging.warning(f"Trades database is in '{journal_mode}' journal mode, reads may briefly block the bot. "
+                        f"Run 'PRAGMA journal_mode=WAL' on it once to avoid this.")
+    return connection
+
+
+def load_cursor_state(state_path):
+    """
+    Load the export cursors (last exported id and update time per table, plus the exported
+    values of open trades) from disk.
+    """
+    state = {
+        "trades": {"last_id": 0, "last_update": ""},
+        "orders": {"last_id": 0, "last_update": ""},
+        "open_trades": {},
+    }
+    if os.path.exists(state_path):
+        with open(state_path) as f:
+            state.update(json.load(f))
+    logging.info(f"Loaded export cursors: {state}")
+    return state
+
+
+def save_cursor_state(state_path, state):
+    """
+    Atomically persist the export cursors so a restart resumes where it left off.
+    """
+    tmp_path = f"{state_path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, state_path)
+
+
+def fetch_changed_rows(connection, cursor_state):
+    """
+    Fetch trades and orders that are new or changed since the given cursors.
+    Both queries run inside one read transaction so they see the same snapshot of the database.
+    Trades have no update timestamp of their own, so a trade counts as changed when it closed or
+    when one of its orders was updated since the last export. Open trades are always returned,
+    as their trailing stop and max/min rates change without any order update; the caller drops
+    the ones whose values did not change.
+    """
+    trades_cursor = cursor_state["trades"]
+    orders_cursor = cursor_state["orders"]
+    connection.execute("BEGIN")
+    try:
+        orders = connection.execute(
+            """
+            SELECT * FROM orders
+            WHERE id > :last_id OR order_update_date > :last_update
+            ORDER BY id
+            """,
+            orders_cursor,
+        ).fetchall()
+        trades = connection.execute(
+            """
+            SELECT trades.*,
+                   (SELECT MAX(order_update_date) FROM orders WHERE ft_trade_id = trades.id) AS last_order_update
+            FROM trades
+            WHERE id > :last_id
+               OR is_open = 1
+               OR close_date > :last_update
+               OR id IN (SELECT ft_trade_id FROM orders WHERE order_update_date > :orders_last_update)
+            ORDER BY id
+            """,
+            {**trades_cursor, "orders_last_update": orders_cursor["last_update"]},
+        ).fetchall()
+    finally:
+        connection.execute("COMMIT")
+    return trades, orders
+
+
+def export_trades_and_orders(connection, client, database_name, table_name, cursor_state, exchange,
+                             written_filter=None):
+    """
+    Send new or changed trade and order rows to Timestream and return the advanced cursors.
+    Cursors only move forward when every record was stored or rejected for good, so rows that
+    failed for a retryable reason (throttling, network) are re-sent next cycle.
+    Each record is versioned by the row's latest update time, so re-sent rows are idempotent
+    while genuinely changed rows overwrite the stored ones. Open trades are compared against
+    the values exported last time; see trade_version().
+    """
+    trades, orders = fetch_changed_rows(connection, cursor_state)
+    export_ms = int(time.time() * 1000)
+    open_trades = {}
+    changed_trades = 0
+
+    records = []
+    for row in trades:
+        trade_records = rows_to_records(row, TRADE_MEASURES, trade_dimensions(row, exchange), row["open_date"])
+        fingerprint = json.dumps([[r["MeasureName"], r["MeasureValue"]] for r in trade_records])
+        previous = cursor_state["open_trades"].get(str(row["id"]))
+        version = trade_version(row, fingerprint, previous, export_ms)
+        if row["is_open"]:
+            open_trades[str(row["id"])] = {"fingerprint": fingerprint, "version": version}
+        if previous is not None and previous["fingerprint"] == fingerprint:
+            # Unchanged open trade, already stored
+            continue
+        records.extend(dict(record, Version=version) for record in trade_records)
+        changed_trades += 1
+    for row in orders:
+        row_time = row["order_date"] or row["order_update_date"] or row["order_filled_date"]
+        if row_time is None:
+            logging.warning(f"Skipping order {row['id']} ({row['order_id']}) without any date.")
+            continue
+        version = row_version(row["order_date"], row["order_filled_date"], row["order_update_date"])
+        order_records = rows_to_records(row, ORDER_MEASURES, order_dimensions(row, exchange), row_time)
+        records.extend(dict(record, Version=version) for record in order_records)
+
+    if not records:
+        logging.info("No new or changed trades/orders to export.")
+        return advance_cursors(cursor_state, trades, orders, open_trades)
+
+    rejected = []
+    written = write_record_batches(client, database_name, table_name, records, written_filter=written_filter,
+                                   rejected=rejected)
+    logging.info(f"Exported {changed_trades} trades and {len(orders)} orders ({written}/{len(records)} records).")
+    if rejected:
+        logging.error(f"{len(rejected)} records were rejected permanently and will not be retried.")
+    if written + len(rejected) < len(records):
+        logging.warning("Some batches failed, keeping cursors to retry on next cycle.")
+        return cursor_state
+
+    return advance_cursors(cursor_state, trades, orders, open_trades)
+
+
+def advance_cursors(cursor_state, trades, orders, open_trades):
+    """
+    Move the id and update-time cursors past the rows that were just exported, and remember
+    what was exported for the trades that are still open.
+    """
+    trades_cursor = dict(cursor_state["trades"])
+    orders_cursor = dict(cursor_state["orders"])
+    for row in trades:
+        trades_cursor["last_id"] = max(trades_cursor["last_id"], row["id"])
+        if row["close_date"]:
+            trades_cursor["last_update"] = max(trades_cursor["last_update"], row["close_date"])
+    for row in orders:
+        orders_cursor["last_id"] = max(orders_cursor["last_id"], row["id"])
+        if row["order_update_date"]:
+            orders_cursor["last_update"] = max(orders_cursor["last_update"], row["order_update_date"])
+    return {"trades": trades_cursor, "orders": orders_cursor, "open_trades": open_trades}
+
+
+def trade_dimensions(row, exchange):
+    return [
+        {"Name": "asset", "Value": row["pair"]},
+        {"Name": "exchange", "Value": exchange},
+        {"Name": "record_type", "Value": "trade"},
+        {"Name": "trade_id", "Value": str(row["id"])},
+        {"Name": "strategy", "Value": row["strategy"] or "None"},
+    ]
+
+
+def order_dimensions(row, exchange):
+    return [
+        {"Name": "asset", "Value": row["ft_pair"]},
+        {"Name": "exchange", "Value": exchange},
+        {"Name": "record_type", "Value": "order"},
+        {"Name": "trade_id", "Value": str(row["ft_trade_id"])},
+        {"Name": "order_id", "Value": str(row["order_id"])},
+        {"Name": "side", "Value": row["ft_order_side"]},
+    ]
+
+
+def row_version(*row_times):
+    """
+    Deterministic record version for a row: its latest known update time in milliseconds.
+    """
+    latest = max(t for t in row_times if t)
+    return int(pd.to_datetime(latest, utc=True).timestamp() * 1000)
+
+
+def trade_version(row, fingerprint, previous, export_ms):
+    """
+    Record version of a trade row, given what was exported for it while it was open.
+    Unchanged values keep the previous version, so re-sends stay idempotent. Changes on an open
+    trade (trailing stop, max/min rate) carry no timestamp in the database, so they are
+    versioned by the export time; changes after that always get a higher version.
+    """
+    if previous is not None and previous["fingerprint"] == fingerprint:
+        return previous["version"]
+    version = row_version(row["open_date"], row["close_date"], row["last_order_update"])
+    if row["is_open"]:
+        version = max(version, export_ms)
+    if previous is not None:
+        version = max(version, previous["version"] + 1)
+    return version
+
+
+def rows_to_records(row, measures, dimensions, row_time):
+    """
+    Convert one database row into Timestream records, one per non-NULL measure column.
+    The caller adds the record Version.
+    """
+    timestamp = pd.to_datetime(row_time, utc=True)
+    columns = row.keys()
+    records = []
+    for col_name, measure_type in measures.items():
+        # Older freqtrade schemas may lack some columns
+        value = row[col_name] if col_name in columns else None
+        if value is None:
+            continue
+        if measure_type == "BIGINT":
+            measure_value = str(int(value))
+        else:
+            measure_value = str(value)
+        records.append({
+            "Dimensions": dimensions,
+            "MeasureName": col_name,
+            "MeasureValue": measure_value,
+            "MeasureValueType": measure_type,
+            "Time": str(int(timestamp.timestamp() * 1000)),  # Convert timestamp to milliseconds
+            "TimeUnit": "MILLISECONDS",
+        })
+    return records
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,7 @@ from botocore.exceptions import ClientError
 
 def load_df():
     np.random.seed(42)  # Ensures reproducibility
-    date_range = pd.date_range(start="2024-01-01", periods=(2*10080), freq="T")  # 2 weeks of minute data
+    date_range = pd.date_range(start="2024-01-01", periods=(2*10080), freq="min")  # 2 weeks of minute data
 
     # Generate random close prices between 50000 and 100000
     close_prices = np.random.uniform(50000, 100000, len(date_range))
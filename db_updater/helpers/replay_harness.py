@@ -0,0 +1,232 @@
+import argparse
+import logging
+import re
+import sys
+import time
+from collections import defaultdict
+from datetime import timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# app.py lives next to this folder and is not installed as a package
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+
+import app  # noqa: E402
+from app import run_updater  # noqa: E402
+from create_test_table import load_df  # noqa: E402
+from timeframes import timeframe_to_ms  # noqa: E402
+
+
+class VirtualClock:
+    """
+    Drop-in replacement for the updater's SystemClock: sleeping only advances the clock.
+    """
+
+    def __init__(self, start):
+        self.current = start
+
+    def now(self):
+        return self.current
+
+    def sleep(self, seconds):
+        self.current += timedelta(seconds=seconds)
+
+
+class FakeFreqtradeClient:
+    """
+    Stands in for FtRestClient, serving the same synthetic candle stream for every pair.
+    Only candles that are closed at the virtual clock's current time are returned.
+    """
+
+    def __init__(self, df, timeframe, pairs, clock):
+        self.timeframe = timeframe
+        self.pairs = pairs
+        self.clock = clock
+        self.timeframe_delta = pd.Timedelta(milliseconds=timeframe_to_ms(timeframe))
+        self.columns = ["date"] + list(df.columns)
+        self._dates = df.index
+        # Pre-render the rows once, like freqtrade's JSON response
+        dates = [d.isoformat() for d in df.index]
+        values = df.astype(object).where(df.notna(), None).values.tolist()
+        self._rows = [[date] + row for date, row in zip(dates, values)]
+
+    def ping(self):
+        return {"status": "pong"}
+
+    def strategy(self, strategy):
+        return {"strategy": strategy, "timeframe": self.timeframe}
+
+    def whitelist(self):
+        return {"whitelist": self.pairs}
+
+    def pair_candles(self, pair, timeframe, limit=None):
+        closed = self._dates.searchsorted(pd.Timestamp(self.clock.now()) - self.timeframe_delta, side="right")
+        start = max(closed - limit, 0) if limit else 0
+        return {"pair": pair, "timeframe": timeframe, "columns": self.columns, "data": self._rows[start:closed]}
+
+
+class FakeCandleSource:
+    """
+    Candle source serving slices of the pre-parsed frame, so the replay times the updater's own
+    logic rather than JSON decoding. Only candles closed at the virtual clock's time are returned.
+    """
+
+    def __init__(self, df, timeframe, clock):
+        self.df = df.rename_axis("date")
+        self.clock = clock
+        self.timeframe_delta = pd.Timedelta(milliseconds=timeframe_to_ms(timeframe))
+
+    def candles(self, pair, timeframe, limit=None):
+        closed = self.df.index.searchsorted(pd.Timestamp(self.clock.now()) - self.timeframe_delta, side="right")
+        start = max(closed - limit, 0) if limit else 0
+        return self.df.iloc[start:closed]
+
+
+class StageTimer:
+    """
+    Accumulates wall time and calls per named stage of the updater.
+    """
+
+    def __init__(self):
+        self.seconds = defaultdict(float)
+        self.calls = defaultdict(int)
+
+    def wrap(self, name, func):
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.seconds[name] += time.perf_counter() - start
+                self.calls[name] += 1
+        return timed
+
+
+class StubSink:
+    """
+    In-memory stand-in for the Timestream write and query clients.
+    Each write costs write_latency seconds of virtual time, and the lag of every base candle
+    (write time minus candle close time) is recorded.
+    """
+
+    def __init__(self, clock, timeframe, write_latency=0.0):
+        self.clock = clock
+        self.timeframe = timeframe
+        self.timeframe_ms = timeframe_to_ms(timeframe)
+        self.write_latency = write_latency
+        self.last_times = {}
+        self.records = 0
+        self.requests = 0
+        self.lags_ms = []
+
+    def write_records(self, DatabaseName, TableName, Records):
+        self.clock.sleep(self.write_latency)
+        now_ms = int(self.clock.now().timestamp() * 1000)
+        self.requests += 1
+        self.records += len(Records)
+        for record in Records:
+            dimensions = {d["Name"]: d["Value"] for d in record["Dimensions"]}
+            key = (dimensions["asset"], dimensions["exchange"], dimensions["granularity"])
+            record_time = int(record["Time"])
+            self.last_times[key] = max(self.last_times.get(key, record_time), record_time)
+            if dimensions["granularity"] == self.timeframe and record["MeasureName"] == "close":
+                self.lags_ms.append(now_ms - (record_time + self.timeframe_ms))
+        return {}
+
+    def query(self, QueryString):
+        self.clock.sleep(self.write_latency)
+        if "measure_name IN" in QueryString:
+            # Candle values are not kept, so rollups start without history
+            return {"Rows": []}
+        filters = dict(re.findall(r"(asset|exchange|granularity) = '([^']*)'", QueryString))
+        last_time = self.last_times.get((filters["asset"], filters["exchange"], filters["granularity"]))
+        if last_time is None:
+            return {"Rows": []}
+        last_time = pd.Timestamp(last_time, unit="ms").strftime("%Y-%m-%d %H:%M:%S.%f000")
+        return {"Rows": [{"Data": [{"ScalarValue": last_time}]}]}
+
+
+def load_replay_df(periods):
+    """
+    Synthetic 1m candles from load_df, with the OHLCV columns freqtrade always provides.
+    """
+    df = load_df().iloc[:periods]
+    df.index = df.index.tz_localize("UTC")
+    close = df["close"]
+    df["open"] = close.shift(1).fillna(close)
+    df["high"] = np.maximum(df["open"], close)
+    df["low"] = np.minimum(df["open"], close)
+    df["volume"] = np.random.default_rng(42).uniform(1, 100, len(df))
+    return df
+
+
+def main():
+    """
+    The replay is bound by the updater's own pandas work per pair and candle (a few ms, see the
+    per-stage timings), so 100 pairs over one day take minutes of wall time, not seconds.
+    Use --pairs / --days to scale it down for quick runs.
+    """
+    parser = argparse.ArgumentParser(description="Replay synthetic candles through the updater on a virtual clock.")
+    parser.add_argument("--pairs", type=int, default=100)
+    parser.add_argument("--days", type=float, default=2)
+    parser.add_argument("--write-latency", type=float, default=0.05,
+                        help="Virtual seconds each Timestream call takes")
+    parser.add_argument("--rest", action="store_true",
+                        help="Serve candles as freqtrade JSON and parse them like the REST path does")
+    args = parser.parse_args()
+
+    # Keep the updater's per-candle INFO logging out of the measurement
+    logging.getLogger().setLevel(logging.WARNING)
+    # The stub keeps no candle values, so the buckets the replay starts in are always incomplete
+    for handler in logging.getLogger().handlers:
+        handler.addFilter(lambda record: not record.getMessage().startswith("Skipping incomplete"))
+
+    timeframe = "1m"
+    warmup = 10
+    periods = warmup + int(args.days * 1440) + 1
+    df = load_replay_df(periods)
+    pairs = [f"PAIR{i}/USDT" for i in range(args.pairs)]
+
+    # Start once the first 10 candles are closed and stop when the stream is exhausted
+    start = df.index[warmup].to_pydatetime()
+    stop_at = df.index[-1].to_pydatetime()
+    clock = VirtualClock(start)
+    freqtrade_client = FakeFreqtradeClient(df, timeframe, pairs, clock)
+    candle_source = app.RestCandleSource(freqtrade_client) if args.rest else FakeCandleSource(df, timeframe, clock)
+    sink = StubSink(clock, timeframe, args.write_latency)
+    # Pretend the warmup candles are already stored, like a restarted updater
+    warmup_ms = int(df.index[warmup - 1].timestamp() * 1000)
+    for pair in pairs:
+        sink.last_times[(pair, "Replay", timeframe)] = warmup_ms
+
+    # Time the updater's stages; update_pair looks these up as module globals at call time
+    timer = StageTimer()
+    candle_source.candles = timer.wrap("fetch candles", candle_source.candles)
+    app.get_last_timestream_timestamp = timer.wrap("last-time query", app.get_last_timestream_timestamp)
+    app.write_records_to_timestream = timer.wrap("build + write records", app.write_records_to_timestream)
+    app.RollupAggregator.update = timer.wrap("rollups", app.RollupAggregator.update)
+
+    wall_start = time.perf_counter()
+    run_updater(freqtrade_client, sink, sink, "replay", "replay", "SampleStrategy", pairs, "Replay",
+                clock=clock, stop_at=stop_at, candle_source=candle_source)
+    wall_seconds = time.perf_counter() - wall_start
+
+    lags = np.asarray(sink.lags_ms) / 1000
+    virtual_seconds = (clock.now() - start).total_seconds()
+    print(f"Replayed {virtual_seconds / 86400:.2f} days of {timeframe} candles for {len(pairs)} pairs "
+          f"in {wall_seconds:.1f}s wall time ({virtual_seconds / wall_seconds:.0f}x real time)")
+    print(f"Candles written: {len(lags)}, records: {sink.records}, write/query calls: {sink.requests}")
+    print(f"Throughput: {len(lags) / wall_seconds:.0f} candles/s, {sink.records / wall_seconds:.0f} records/s")
+    if len(lags):
+        print(f"End-to-end lag (virtual s): mean {lags.mean():.1f}, p50 {np.percentile(lags, 50):.1f}, "
+              f"p95 {np.percentile(lags, 95):.1f}, max {lags.max():.1f}")
+    print("Wall time per stage (rollup writes count towards 'build + write records'):")
+    for name, seconds in sorted(timer.seconds.items(), key=lambda item: -item[1]):
+        print(f"  {name:<22} {seconds:7.1f}s  {100 * seconds / wall_seconds:5.1f}%  "
+              f"{1e6 * seconds / timer.calls[name]:7.0f} us/call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+# flake8: noqa: F401
+# isort: skip_file
+import logging
+import os
+from pathlib import Path
+from typing import Dict
+
+import pyarrow as pa
+from pandas import DataFrame
+
+logger = logging.getLogger(__name__)
+
+
+def export_path(directory: Path, pair: str, timeframe: str) -> Path:
+    """
+    Arrow file of a pair, named like freqtrade's data files (BTC/USDT -> BTC_USDT-5m.arrow).
+    """
+    return Path(directory) / f"{pair.replace('/', '_').replace(':', '_')}-{timeframe}.arrow"
+
+
+def frame_schema(dataframe: DataFrame) -> pa.Schema:
+    # Columns that are all None so far (e.g. enter_tag) would be typed null; store them as strings
+    schema = pa.Schema.from_pandas(dataframe, preserve_index=False)
+    for i, field in enumerate(schema):
+        if pa.types.is_null(field.type):
+            schema = schema.set(i, field.with_type(pa.string()))
+    return schema
+
+
+class ArrowCandleExporter:
+    """
+    Appends the newest analyzed candles of every pair to a per-pair Arrow IPC stream file, so a
+    reader on the same host can memory-map them instead of fetching JSON from the REST API.
+
+    A file is the schema message followed by one record batch message per export, each appended
+    with a single write. There is no end-of-stream marker, so readers stop at the end of the file
+    (or at a batch that is still being written) and continue from there on their next read.
+    Files are never truncated in place, which would break readers that have them mapped: when the
+    schema changes or a file grows past max_rows it is rewritten to a temporary file, with the
+    newest initial_rows candles, and atomically replaced.
+    """
+
+    def __init__(self, directory: Path, initial_rows: int = 500, max_rows: int = 5000):
+        """
+        :param directory: Directory of the Arrow files, created if missing
+        :param initial_rows: Candles written when a file is (re)started
+        :param max_rows: Rows after which a file is rewritten with only the newest initial_rows
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.initial_rows = initial_rows
+        self.max_rows = max_rows
+        # pair -> {'last_date', 'schema', 'rows'} of the file written by this process
+        self._state: Dict[str, dict] = {}
+
+    def export(self, pair: str, timeframe: str, dataframe: DataFrame) -> int:
+        """
+        Write the candles of dataframe newer than the last exported one.
+        :param pair: Pair of the dataframe
+        :param timeframe: Timeframe of the dataframe
+        :param dataframe: Analyzed dataframe with a 'date' column, sorted by date
+        :return: Number of candles written
+        """
+        if dataframe.empty:
+            return 0
+        path = export_path(self.directory, pair, timeframe)
+        state = self._state.get(pair)
+        if state is None:
+            return self._rewrite(pair, path, dataframe)
+
+        new_rows = dataframe[dataframe['date'] > state['last_date']]
+        if new_rows.empty:
+            return 0
+        if state['rows'] + len(new_rows) > self.max_rows:
+            return self._rewrite(pair, path, dataframe)
+        try:
+            batch = pa.RecordBatch.from_pandas(new_rows, schema=state['schema'], preserve_index=False)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, KeyError):
+            # Columns or their types changed (e.g. a new strategy version): start a new file
+            return self._rewrite(pair, path, dataframe)
+
+        with open(path, 'ab') as f:
+            f.write(batch.serialize())
+        state['last_date'] = new_rows['date'].iloc[-1]
+        state['rows'] += len(new_rows)
+        return len(new_rows)
+
+    def _rewrite(self, pair: str, path: Path, dataframe: DataFrame) -> int:
+        rows = dataframe.iloc[-self.initial_rows:]
+        schema = frame_schema(rows)
+        batch = pa.RecordBatch.from_pandas(rows, schema=schema, preserve_index=False)
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(schema.serialize())
+            f.write(batch.serialize())
+        os.replace(tmp_path, path)
+        self._state[pair] = {'last_date': rows['date'].iloc[-1], 'schema': schema, 'rows': len(rows)}
+        return len(rows)
+
+
+class ArrowExportMixin:
+    """
+    Strategy mixin that appends the newest analyzed candles (indicators, entry and exit signals)
+    of each pair to user_data/arrow_export/<pair>-<timeframe>.arrow after every analysis, for
+    db_updater's ArrowCandleSource. Only active in live / dry-run:
+        "arrow_export": {"enabled": true, "directory": "arrow_export", "max_rows": 5000}
+    """
+
+    arrow_exporter = None
+
+    def bot_start(self, **kwargs) -> None:
+        settings = self.config.get('arrow_export', {})
+        if settings.get('enabled', False) and self.dp and self.dp.runmode.value in ('live', 'dry_run'):
+            directory = Path(self.config.get('user_data_dir', '.')) / settings.get('directory', 'arrow_export')
+            self.arrow_exporter = ArrowCandleExporter(
+                directory,
+                initial_rows=settings.get('initial_rows', 500),
+                max_rows=settings.get('max_rows', 5000),
+            )
+            logger.info(f"Exporting analyzed candles to {directory}.")
+        super().bot_start(**kwargs)
+
+    def advise_exit(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
+        dataframe = super().advise_exit(dataframe, metadata)
+        if self.arrow_exporter is not None:
+            try:
+                self.arrow_exporter.export(metadata['pair'], self.timeframe, dataframe)
+            except Exception as e:
+                # Exporting is best effort and must never stop the analysis
+                logger.warning(f"Arrow export of {metadata['pair']} failed: {e}")
+        return dataframe
@@ -0,0 +1,201 @@
+# flake8: noqa: F401
+# isort: skip_file
+import atexit
+import logging
+import signal
+import tracemalloc
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+logger = logging.getLogger(__name__)
+
+
+def _output_bytes(result: Any) -> int:
+    """
+    Size of an indicator's output data, without the index.
+    """
+    if isinstance(result, pd.DataFrame):
+        return int(result.memory_usage(index=False, deep=False).sum())
+    if isinstance(result, pd.Series):
+        return int(result.memory_usage(index=False, deep=False))
+    if isinstance(result, np.ndarray):
+        return result.nbytes
+    if isinstance(result, dict):
+        return sum(_output_bytes(value) for value in result.values())
+    if isinstance(result, (list, tuple)):
+        return sum(_output_bytes(value) for value in result)
+    return 0
+
+
+class IndicatorProfiler:
+    """
+    Records wall time, allocated bytes and output size of every ta.* / qtpylib.* call a strategy
+    makes, per indicator and pair, and produces a ranked cost report.
+    Memory tracing uses tracemalloc, which slows down all allocations, so it is opt-in.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.trace_memory = False
+        self.report_path: Optional[Path] = None
+        self._pair = ''
+        # (indicator, pair) -> [calls, seconds, allocated bytes, output bytes]
+        self._stats: Dict[Tuple[str, str], list] = defaultdict(lambda: [0, 0.0, 0, 0])
+
+    def configure(self, enabled: bool = True, trace_memory: bool = False, report_path: Optional[Path] = None):
+        self.enabled = enabled
+        self.trace_memory = trace_memory
+        self.report_path = report_path
+        if enabled and trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def wrap(self, module: Any, prefix: str) -> Any:
+        """
+        Return a stand-in for an indicator module whose functions are profiled, e.g.
+        ta = PROFILER.wrap(ta, 'ta')
+        """
+        return _ProfiledModule(self, module, prefix)
+
+    @contextmanager
+    def pair(self, pair: str):
+        """
+        Attribute indicator calls made inside this context to the given pair.
+        """
+        previous, self._pair = self._pair, pair
+        try:
+            yield
+        finally:
+            self._pair = previous
+
+    def call(self, name: str, func, *args, **kwargs):
+        if not self.enabled:
+            return func(*args, **kwargs)
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            memory_before = tracemalloc.get_traced_memory()[0]
+        start = perf_counter()
+        result = func(*args, **kwargs)
+        elapsed = perf_counter() - start
+
+        stats = self._stats[(name, self._pair)]
+        stats[0] += 1
+        stats[1] += elapsed
+        if self.trace_memory:
+            stats[2] += tracemalloc.get_traced_memory()[1] - memory_before
+        stats[3] += _output_bytes(result)
+        return result
+
+    def reset(self):
+        self._stats.clear()
+
+    def report(self, by_pair: bool = False) -> DataFrame:
+        """
+        Cost per indicator (and pair, if by_pair), ranked by total time.
+        :param by_pair: Break the report down per pair instead of summing over pairs
+        :return: Dataframe with calls, total/mean time, time share, mean allocated and output size
+        """
+        rows = [
+            {'indicator': name, 'pair': pair, 'calls': calls, 'total_ms': seconds * 1000,
+             'allocated_kb': allocated / 1024, 'output_kb': output / 1024}
+            for (name, pair), (calls, seconds, allocated, output) in self._stats.items()
+        ]
+        columns = ['indicator', 'pair', 'calls', 'total_ms', 'allocated_kb', 'output_kb']
+        df = DataFrame(rows, columns=columns)
+        if df.empty:
+            return df
+        keys = ['indicator', 'pair'] if by_pair else ['indicator']
+        df = df.groupby(keys).agg(
+            calls=('calls', 'sum'), total_ms=('total_ms', 'sum'),
+            allocated_kb=('allocated_kb', 'sum'), output_kb=('output_kb', 'sum'),
+        )
+        df['mean_ms'] = df['total_ms'] / df['calls']
+        df['share_pct'] = 100 * df['total_ms'] / df['total_ms'].sum()
+        df['mean_allocated_kb'] = df['allocated_kb'] / df['calls']
+        df['mean_output_kb'] = df['output_kb'] / df['calls']
+        df = df.drop(columns=['allocated_kb', 'output_kb']).sort_values('total_ms', ascending=False)
+        if not self.trace_memory:
+            df = df.drop(columns=['mean_allocated_kb'])
+        return df
+
+    def write_report(self, path: Optional[Path] = None) -> str:
+        """
+        Log the ranked report and write it, with the per-pair breakdown, to path (or report_path).
+        """
+        text = (f"Indicator cost ranking:\n{self.report().round(3).to_string()}\n\n"
+                f"Per pair:\n{self.report(by_pair=True).round(3).to_string()}\n")
+        logger.info(text)
+        path = path or self.report_path
+        if path:
+            Path(path).write_text(text)
+            logger.info(f"Indicator cost report written to {path}")
+        return text
+
+
+class _ProfiledModule:
+    def __init__(self, profiler: IndicatorProfiler, module: Any, prefix: str):
+        self._profiler = profiler
+        self._module = module
+        self._prefix = prefix
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._module, name)
+        if not callable(attr):
+            return attr
+        profiler = self._profiler
+        indicator = f'{self._prefix}.{name}'
+
+        def profiled(*args, **kwargs):
+            return profiler.call(indicator, attr, *args, **kwargs)
+
+        # Cache the wrapper so later lookups skip __getattr__
+        setattr(self, name, profiled)
+        return profiled
+
+
+# Shared by all strategies of the process, so wrapped modules and the mixin agree
+PROFILER = IndicatorProfiler()
+
+
+class IndicatorProfilerMixin:
+    """
+    Strategy mixin that attributes profiled indicator calls to the analyzed pair and reports them.
+
+    Put it before IStrategy in the bases, wrap the indicator modules with PROFILER.wrap() and
+    enable it in the config:
+        "indicator_profiler": {"enabled": true, "trace_memory": false}
+    The ranked report is written to user_data/indicator_profile.txt when the process exits
+    (e.g. after a backtest) and on demand in live mode by sending SIGUSR1:
+        docker compose kill -s SIGUSR1 freqtrade
+    """
+
+    def bot_start(self, **kwargs) -> None:
+        settings = self.config.get('indicator_profiler', {})
+        if settings.get('enabled', False):
+            report_path = Path(self.config.get('user_data_dir', '.')) / 'indicator_profile.txt'
+            PROFILER.configure(True, settings.get('trace_memory', False), report_path)
+            atexit.register(PROFILER.write_report)
+            try:
+                signal.signal(signal.SIGUSR1, lambda signum, frame: PROFILER.write_report())
+            except (AttributeError, ValueError):
+                # No SIGUSR1 on this platform, or not running in the main thread
+                logger.warning("On-demand indicator report via SIGUSR1 is not available.")
+        super().bot_start(**kwargs)
+
+    def advise_indicators(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
+        with PROFILER.pair(metadata['pair']):
+            return super().advise_indicators(dataframe, metadata)
+
+    def advise_entry(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
+        with PROFILER.pair(metadata['pair']):
+            return super().advise_entry(dataframe, metadata)
+
+    def advise_exit(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
+        with PROFILER.pair(metadata['pair']):
+            return super().advise_exit(dataframe, metadata)
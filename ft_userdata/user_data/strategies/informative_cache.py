@@ -0,0 +1,146 @@
+# flake8: noqa: F401
+# isort: skip_file
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+from typing import Dict, List, Optional, Tuple
+
+from freqtrade.exchange import timeframe_to_minutes
+
+
+def take_matched(values: np.ndarray, positions: np.ndarray) -> np.ndarray:
+    """
+    Gather values at positions, using NaN / NaT where positions is -1 (no match).
+    """
+    if values.dtype.kind in 'biu':
+        values = values.astype(float)
+    missing = np.datetime64('NaT') if values.dtype.kind == 'M' else np.nan
+    return np.where(positions >= 0, values[np.maximum(positions, 0)], missing)
+
+
+class InformativeMergeCache:
+    """
+    Incremental replacement for merge_informative_pair().
+
+    merge_informative_pair() renames, shifts and re-joins the whole informative frame onto the
+    whole base frame on every candle. This cache keeps, per (pair, informative timeframe), only the
+    date alignment: the merge dates of the informative candles and the informative row matched to
+    each base candle. On a new candle only the newest rows are matched, with an as-of
+    (searchsorted) lookup, and the cached matches of all older rows are reused. Column values are
+    always read from the informative frame passed in, so indicators that are recomputed over the
+    whole history (e.g. EMAs on a sliding window) are never served stale.
+
+    The result equals merge_informative_pair(..., ffill=True): each base candle gets the last
+    informative candle that was closed at that candle's close (an as-of join).
+
+    Usage, inside populate_indicators:
+        informative = self.dp.get_pair_dataframe(pair=metadata['pair'], timeframe='1h')
+        informative['rsi'] = ta.RSI(informative, timeperiod=14)
+        dataframe = self.informative_cache.merge(dataframe, informative, metadata['pair'],
+                                                 self.timeframe, '1h')
+    """
+
+    def __init__(self):
+        self._informative: Dict[Tuple[str, str], dict] = {}
+        self._matches: Dict[Tuple[str, str], dict] = {}
+
+    def merge(self, dataframe: DataFrame, informative: DataFrame, pair: str, timeframe: str,
+              timeframe_inf: str, columns: Optional[List[str]] = None, append_timeframe: bool = True,
+              suffix: Optional[str] = None) -> DataFrame:
+        """
+        Add the informative columns to dataframe, named like merge_informative_pair() does.
+        :param dataframe: Base dataframe, sorted by 'date'
+        :param informative: Informative dataframe, sorted by 'date'
+        :param pair: Pair the informative data belongs to (cache key)
+        :param timeframe: Timeframe of the base dataframe
+        :param timeframe_inf: Timeframe of the informative dataframe (cache key)
+        :param columns: Informative columns to merge, defaults to all columns (including 'date')
+        :param append_timeframe: Rename columns to <column>_<timeframe_inf>
+        :param suffix: Rename columns to <column>_<suffix>, requires append_timeframe=False
+        :return: dataframe with the informative columns added
+        """
+        if append_timeframe and suffix:
+            raise ValueError("You cannot specify `append_timeframe` as True and a `suffix`.")
+        key = (pair, timeframe_inf)
+        columns = list(informative.columns) if columns is None else ['date'] + [c for c in columns if c != 'date']
+        informative_dates = self._update_informative(key, informative, timeframe, timeframe_inf)
+        positions = self._update_matches(key, dataframe, informative_dates)
+
+        for col in columns:
+            merged = take_matched(informative[col].values, positions)
+            if col == 'date':
+                merged = pd.DatetimeIndex(merged).tz_localize(informative['date'].dt.tz)
+            if suffix:
+                dataframe[f'{col}_{suffix}'] = merged
+            elif append_timeframe:
+                dataframe[f'{col}_{timeframe_inf}'] = merged
+            else:
+                dataframe[col] = merged
+        return dataframe
+
+    def _update_informative(self, key, informative: DataFrame, timeframe: str, timeframe_inf: str) -> dict:
+        """
+        Replace the cached merge dates with those of the current informative frame, recording how
+        many cached rows slid out of its start and the first merge date that is new.
+        If the dates no longer line up with the cache, the cached matches are dropped.
+        """
+        offset = np.timedelta64(timeframe_to_minutes(timeframe_inf) - timeframe_to_minutes(timeframe), 'm')
+        # An informative candle becomes usable on the base candle that closes at the same time
+        dates = informative['date'].to_numpy(dtype='datetime64[ns]') + offset
+        cached = self._informative.get(key)
+
+        dropped = None
+        if cached is not None and len(cached['dates']):
+            # The rows up to the cached last date must be the tail of the cached dates
+            known = int(np.searchsorted(dates, cached['dates'][-1], side='right'))
+            if 0 < known <= len(cached['dates']) and np.array_equal(dates[:known], cached['dates'][-known:]):
+                dropped = len(cached['dates']) - known
+        if dropped is None:
+            known = 0
+            self._matches.pop(key, None)
+
+        informative_dates = {
+            'dates': dates,
+            'dropped': dropped,
+            'first_new': dates[known] if known < len(dates) else None,
+        }
+        self._informative[key] = informative_dates
+        return informative_dates
+
+    def _update_matches(self, key, dataframe: DataFrame, informative_dates: dict) -> np.ndarray:
+        """
+        Return, per base row, the index of the informative row to use (-1 for none).
+        Matches of base rows that were seen before, and that no new informative row can change,
+        are reused; only the remaining rows are looked up with searchsorted.
+        """
+        dates = dataframe['date'].to_numpy(dtype='datetime64[ns]')
+        cached = self._matches.get(key)
+
+        reused = 0
+        if cached is not None and len(dates) and len(cached['dates']):
+            first = int(np.searchsorted(cached['dates'], dates[0]))
+            overlap = min(len(cached['dates']) - first, len(dates))
+            if (overlap > 0 and cached['dates'][first] == dates[0]
+                    and cached['dates'][first + overlap - 1] == dates[overlap - 1]):
+                reused = overlap
+                if informative_dates['first_new'] is not None:
+                    # Rows at or after the first new informative row may now match it
+                    reused = int(np.searchsorted(dates[:overlap], informative_dates['first_new']))
+                # Shift to the current informative rows; rows that slid out of the frame match nothing
+                positions = cached['positions'][first:first + reused] - informative_dates['dropped']
+                positions = np.maximum(positions, -1)
+
+        if reused:
+            tail = np.searchsorted(informative_dates['dates'], dates[reused:], side='right') - 1
+            positions = np.concatenate([positions, tail])
+        else:
+            positions = np.searchsorted(informative_dates['dates'], dates, side='right') - 1
+
+        self._matches[key] = {'dates': dates, 'positions': positions}
+
+        # merge_informative_pair() only sees informative candles whose merge date is inside the
+        # base frame, so the rows before the first one in the frame stay empty
+        if len(dates):
+            first_visible = np.searchsorted(informative_dates['dates'], dates[0])
+            positions = np.where(positions < first_visible, -1, positions)
+        return positions
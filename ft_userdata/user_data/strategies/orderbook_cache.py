@@ -0,0 +1,214 @@
+# flake8: noqa: F401
+# isort: skip_file
+import asyncio
+import logging
+from datetime import datetime
+from threading import Lock
+from time import monotonic
+from typing import Callable, Dict, List, Optional, Tuple
+
+from freqtrade.persistence import Trade
+
+logger = logging.getLogger(__name__)
+
+
+class OrderBookCache:
+    """
+    Order books per (pair, depth), reused for ttl seconds.
+    A cached book also serves requests for a smaller depth of the same pair, since it already
+    contains those levels.
+    """
+
+    def __init__(self, fetch: Callable[[str, int], dict], ttl: float = 5.0,
+                 fetch_many: Optional[Callable[[List[str], int], Dict[str, object]]] = None,
+                 clock: Callable[[], float] = monotonic):
+        """
+        :param fetch: Uncached order book fetch, called as fetch(pair, depth)
+        :param ttl: Seconds a fetched order book is served from the cache
+        :param fetch_many: Rate-limited burst fetch, called as fetch_many(pairs, depth) and
+                           returning {pair: order book or the exception it raised}.
+                           Defaults to calling fetch once per pair.
+        :param clock: Monotonic time source in seconds
+        """
+        self.fetch = fetch
+        self.ttl = ttl
+        self.fetch_many = fetch_many
+        self.clock = clock
+        self._books: Dict[Tuple[str, int], Tuple[float, dict]] = {}
+        self._lock = Lock()
+        self.reset_stats()
+
+    def get(self, pair: str, limit: int = 100) -> dict:
+        """
+        Same signature as Exchange.fetch_l2_order_book(), so it can stand in for it.
+        """
+        book = self._lookup(pair, limit)
+        if book is not None:
+            with self._lock:
+                self.hits += 1
+            return book
+        with self._lock:
+            self.misses += 1
+        return self._fetch(pair, limit)
+
+    def prefetch(self, pairs: List[str], depth: int) -> int:
+        """
+        Fetch the order books of all pairs not cached yet in one burst.
+        Failed fetches are logged and left to be retried on first use.
+        :return: Number of order books fetched
+        """
+        missing = [pair for pair in pairs if self._lookup(pair, depth) is None]
+        if not missing:
+            return 0
+        if self.fetch_many is None:
+            results = {}
+            for pair in missing:
+                try:
+                    results[pair] = self.fetch(pair, depth)
+                except Exception as e:
+                    results[pair] = e
+        else:
+            results = self.fetch_many(missing, depth)
+
+        fetched = 0
+        now = self.clock()
+        with self._lock:
+            for pair, book in results.items():
+                if isinstance(book, Exception):
+                    self.fetch_errors += 1
+                    logger.warning(f"Prefetching the order book of {pair} failed: {book}")
+                    continue
+                self._books[(pair, depth)] = (now, book)
+                fetched += 1
+            self.prefetched += fetched
+        return fetched
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.prefetched = 0
+        self.fetch_errors = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'prefetched': self.prefetched,
+            'fetch_errors': self.fetch_errors,
+            'cached': len(self._books),
+        }
+
+    def _lookup(self, pair: str, depth: int) -> Optional[dict]:
+        now = self.clock()
+        with self._lock:
+            # Drop expired books so the cache only ever holds the current burst
+            for key in [key for key, (fetched_at, _) in self._books.items() if now - fetched_at >= self.ttl]:
+                del self._books[key]
+            deeper = [key for key in self._books if key[0] == pair and key[1] >= depth]
+            if not deeper:
+                return None
+            return self._books[min(deeper, key=lambda key: key[1])][1]
+
+    def _fetch(self, pair: str, depth: int) -> dict:
+        try:
+            book = self.fetch(pair, depth)
+        except Exception:
+            with self._lock:
+                self.fetch_errors += 1
+            raise
+        with self._lock:
+            self._books[(pair, depth)] = (self.clock(), book)
+        return book
+
+
+def exchange_burst_fetch(exchange) -> Callable[[List[str], int], Dict[str, object]]:
+    """
+    Burst fetch through freqtrade's async ccxt client, the way freqtrade downloads candles of
+    many pairs: all requests are gathered on the exchange's event loop and ccxt's rate limiter
+    spaces them out. Relies on Exchange internals (_api_async, _loop_lock, _ft_has).
+    """
+    async def fetch_all(pairs, limit):
+        return await asyncio.gather(
+            *(exchange._api_async.fetch_l2_order_book(pair, limit) for pair in pairs), return_exceptions=True
+        )
+
+    def fetch_many(pairs: List[str], depth: int) -> Dict[str, object]:
+        # Round the depth up to one the exchange supports, like fetch_l2_order_book() does
+        limit = exchange.get_next_limit_in_list(
+            depth, exchange._ft_has['l2_limit_range'], exchange._ft_has['l2_limit_range_required']
+        )
+        with exchange._loop_lock:
+            books = exchange.loop.run_until_complete(fetch_all(pairs, limit))
+        return dict(zip(pairs, books))
+
+    return fetch_many
+
+
+class OrderBookCacheMixin:
+    """
+    Strategy mixin that puts an OrderBookCache in front of the exchange's order book fetch.
+
+    Both dp.orderbook() in the strategy and freqtrade's order-book based entry / exit pricing
+    go through Exchange.fetch_l2_order_book(), so with the cache installed they share one fetch
+    per pair and TTL. Books are only prefetched when they are about to be needed: for pairs with
+    a new candle to analyze (analysis and entry pricing), and for pairs with open trades, whose
+    exit price freqtrade checks every loop. Only active in live / dry-run:
+        "orderbook_cache": {"enabled": true, "ttl_seconds": 5, "stats_interval": 300}
+    Keep the TTL at or below process_throttle_secs so pricing sees a book from the current loop.
+    """
+
+    orderbook_cache: Optional[OrderBookCache] = None
+
+    def bot_start(self, **kwargs) -> None:
+        settings = self.config.get('orderbook_cache', {})
+        if settings.get('enabled', False) and self.dp and self.dp.runmode.value in ('live', 'dry_run'):
+            exchange = self.dp._exchange
+            self.orderbook_cache = OrderBookCache(
+                exchange.fetch_l2_order_book,
+                ttl=settings.get('ttl_seconds', 5),
+                fetch_many=exchange_burst_fetch(exchange),
+            )
+            # Shadow the bound method, so every caller of the exchange goes through the cache
+            exchange.fetch_l2_order_book = self.orderbook_cache.get
+            self._orderbook_depth = max(
+                self.config.get('entry_pricing', {}).get('order_book_top', 1),
+                self.config.get('exit_pricing', {}).get('order_book_top', 1),
+            )
+            self._orderbook_candles: Dict[str, datetime] = {}
+            self._orderbook_stats_interval = settings.get('stats_interval', 300)
+            self._orderbook_stats_logged = monotonic()
+            logger.info(f"Order book cache enabled with a TTL of {self.orderbook_cache.ttl}s.")
+        super().bot_start(**kwargs)
+
+    def bot_loop_start(self, current_time: datetime, **kwargs) -> None:
+        if self.orderbook_cache is not None:
+            pairs = self._orderbook_pairs_due()
+            if pairs:
+                self.orderbook_cache.prefetch(pairs, self._orderbook_depth)
+            if monotonic() - self._orderbook_stats_logged >= self._orderbook_stats_interval:
+                self._orderbook_stats_logged = monotonic()
+                stats = self.orderbook_cache.stats()
+                logger.info(f"Order book cache: {stats['hits']} hits, {stats['misses']} misses "
+                            f"({stats['hit_rate']:.1%} hit rate), {stats['prefetched']} prefetched, "
+                            f"{stats['fetch_errors']} fetch errors.")
+        super().bot_loop_start(current_time=current_time, **kwargs)
+
+    def _orderbook_pairs_due(self) -> List[str]:
+        """
+        Pairs whose order book will be requested during this loop.
+        """
+        due = set()
+        if self.config.get('exit_pricing', {}).get('use_order_book', False):
+            due.update(trade.pair for trade in Trade.get_open_trades())
+        for pair in self.dp.current_whitelist():
+            candles = self.dp.ohlcv(pair, self.timeframe, copy=False)
+            if candles.empty:
+                continue
+            # The candles were just refreshed; a new last candle means the pair is analyzed this loop
+            last_candle = candles['date'].iloc[-1]
+            if self._orderbook_candles.get(pair) != last_candle:
+                self._orderbook_candles[pair] = last_candle
+                due.add(pair)
+        return sorted(due)
@@ -34,10 +34,18 @@ from freqtrade.strategy import (
 # Add your lib to import here
 import talib.abstract as ta
 from technical import qtpylib
+# from informative_cache import InformativeMergeCache
+from indicator_profiler import PROFILER, IndicatorProfilerMixin
+from orderbook_cache import OrderBookCacheMixin
+from arrow_export import ArrowExportMixin
+
+# Profile every indicator call; a no-op unless "indicator_profiler" is enabled in the config
+ta = PROFILER.wrap(ta, "ta")
+qtpylib = PROFILER.wrap(qtpylib, "qtpylib")
 
 
 # This class is a sample. Feel free to customize it.
-class SampleStrategy(IStrategy):
+class SampleStrategy(ArrowExportMixin, OrderBookCacheMixin, IndicatorProfilerMixin, IStrategy):
     """
     This is a sample strategy to inspire you.
     More information in https://www.freqtrade.io/en/latest/strategy-customization/
@@ -349,7 +357,19 @@ class SampleStrategy(IStrategy):
         # dataframe['ha_high'] = heikinashi['high']
         # dataframe['ha_low'] = heikinashi['low']
 
+        # # Informative pairs
+        # # ------------------------------------
+        # # Return [(metadata pair, "1h")] from informative_pairs() and add
+        # # `informative_cache = InformativeMergeCache()` as a class attribute.
+        # # Only the newest candles are matched on each call instead of re-merging the whole frame.
+        # informative = self.dp.get_pair_dataframe(pair=metadata["pair"], timeframe="1h")
+        # informative["rsi"] = ta.RSI(informative, timeperiod=14)
+        # dataframe = self.informative_cache.merge(
+        #     dataframe, informative, metadata["pair"], self.timeframe, "1h", columns=["rsi"]
+        # )
+
         # Retrieve best bid and best ask from the orderbook
+        # With "orderbook_cache" enabled this reuses the book fetched for pricing in this loop
         # ------------------------------------
         """
         # first check if dataprovider is available